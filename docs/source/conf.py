@@ -28,4 +28,5 @@ html_theme = 'furo'
 html_static_path = ['_static']
 
 # For C autodoc
-hawkmoth_root = os.path.abspath('../../src')
\ No newline at end of file
+hawkmoth_root = os.path.abspath('../../src')
+hawkmoth_clang = [f'-I{hawkmoth_root}']
\ No newline at end of file
@@ -1,23 +1,40 @@
 import sys
 import os
+import shlex
+import atexit
+import argparse
 import subprocess
 from pathlib import Path
 
 
+# Set by --yes: every question is answered with its default, without /dev/tty
+assume_yes = False
+
+# Opened on first use and kept for the rest of the wizard
+tty_in = None
+
+def close_tty():
+    if tty_in is not None:
+        tty_in.close()
+
 def input_tty(prompt=""):
-    try:
-        with open("/dev/tty", "r") as tty_in:
-            sys.stdout.write(prompt)
-            sys.stdout.flush()
-            return tty_in.readline().strip()
-    except FileNotFoundError:
-        sys.exit("Cannot access terminal input (/dev/tty). Please download install.py from GitHub and run it normally.")
+    global tty_in
+    if tty_in is None:
+        try:
+            tty_in = open("/dev/tty", "r")
+        except FileNotFoundError:
+            sys.exit("Cannot access terminal input (/dev/tty). Please download install.py from GitHub and run it normally.")
+        atexit.register(close_tty)
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    return tty_in.readline().strip()
 
 def abort(msg="Installation halted by user, aborting..."):
     print(msg)
     sys.exit()
 
 def ask_option(prompt, *options):
+    if assume_yes: return 1
     print(prompt)
     for i, o in enumerate(options):
         print(f"  {i+1}. {o}" + (" (default)" if i==0 else ""))
@@ -37,20 +54,41 @@ def ask_option(prompt, *options):
     return 1 if response == "" else int(response)
 
 def skippable_input(prompt, default=""):
+    if assume_yes: return default
     print(prompt)
     response = input_tty("Enter to skip or q to abort: ").strip()
     print()
     if response == "q": abort()
     return response if response != "" else default
 
-def run(*args, **kwargs):
+def run(*args, quiet=False, **kwargs):
+    # Quiet commands discard stdout and only keep stderr for error reports
+    if quiet:
+        kwargs.update(stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
     result = subprocess.run(*args, **kwargs)
     if result.returncode != 0:
+        if result.stderr:
+            sys.stderr.write(result.stderr.decode(errors="replace"))
         abort("\nError detected. Aborting...")
     return result
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Raven installation wizard. Any question answered by a flag is skipped.")
+    parser.add_argument("--install-dir", type=Path, help="directory to install into (must be empty)")
+    parser.add_argument("--cmake-flags", help='extra flags passed to CMake; use the --cmake-flags="..." form, since the value starts with "-"')
+    parser.add_argument("--optimize", action=argparse.BooleanOptionalAction, help="build with LTO and -march=native")
+    parser.add_argument("--build-flags", help='extra flags passed to the build command; use the --build-flags="..." form, since the value starts with "-"')
+    parser.add_argument("--bashrc", type=Path, help="add the bin directory to PATH using this file")
+    parser.add_argument("--run-tests", action=argparse.BooleanOptionalAction, help="run the test suite after installing")
+    parser.add_argument("-y", "--yes", action="store_true", help="use the default for every remaining question")
+    return parser.parse_args()
+
 def main():
+    global assume_yes
+    args = parse_args()
+    assume_yes = args.yes
+
     print("\n".join([x.strip() for x in """
         Welcome to the Raven installation wizard!
         For any of these questions, simply press Enter to use the default,
@@ -61,51 +99,77 @@ def main():
     cwd = Path(os.getcwd())
     main_dir = cwd / ".raven"
 
-    match ask_option(f"Raven will be installed into '{main_dir}'. Is this okay?",
-                    "Yes, continue installation at this directory",
-                    "No, use a different directory (must be empty)"):
-        case 1: pass
-        case 2:
-            main_dir = Path(input_tty("Path for installation: ")).expanduser().resolve()
-            if main_dir.exists() and not main_dir.is_dir():
-                abort("Tried to use file as directory. Aborting...")
+    if args.install_dir is not None:
+        main_dir = args.install_dir.expanduser().resolve()
+    else:
+        match ask_option(f"Raven will be installed into '{main_dir}'. Is this okay?",
+                        "Yes, continue installation at this directory",
+                        "No, use a different directory (must be empty)"):
+            case 1: pass
+            case 2:
+                main_dir = Path(input_tty("Path for installation: ")).expanduser().resolve()
 
-    if not main_dir.exists():
-        main_dir.mkdir()
-    if any(main_dir.iterdir()): # Contains files
-        abort("Requires an empty directory. Aborting...")
+    try:
+        main_dir.mkdir(parents=True, exist_ok=True)
+    except (FileExistsError, NotADirectoryError):
+        abort("Tried to use file as directory. Aborting...")
+    with os.scandir(main_dir) as entries:
+        if next(entries, None) is not None: # Contains files
+            abort("Requires an empty directory. Aborting...")
 
     source_dir = main_dir / "source"
     build_dir = source_dir / "build"
     bin_dir = main_dir / "bin"
 
-    run(["git", "clone", "https://github.com/late-parrot/craven.git", source_dir], capture_output=True)
+    clone_flags = ["--depth=1", "--filter=blob:none", "--single-branch"]
+    if "CRAVEN_REF" in os.environ:
+        clone_flags += ["--branch", os.environ["CRAVEN_REF"]]
+    run(["git", "clone"] + clone_flags + ["https://github.com/late-parrot/craven.git", source_dir], quiet=True)
 
 
     if not build_dir.exists():
         build_dir.mkdir()
     os.chdir(build_dir)
-    cmake_flags = skippable_input("CMake flags (see https://github.com/late-parrot/craven for details).")
-    run(["cmake", "..", f"-DCMAKE_INSTALL_PREFIX={main_dir}", "-DCMAKE_BUILD_TYPE=Release"] + cmake_flags.split())
+    if args.optimize is not None:
+        choice = 1 if args.optimize else 2
+    else:
+        choice = ask_option("Enable aggressive optimizations (LTO + native arch)? The binary may not run on other machines.",
+                        "Yes, optimize for this machine",
+                        "No, use the standard release build")
+    match choice:
+        case 1: opt_flags = ["-DRAVEN_ENABLE_LTO=ON", "-DRAVEN_NATIVE_ARCH=ON"]
+        case 2: opt_flags = []
+    cmake_flags = args.cmake_flags if args.cmake_flags is not None else skippable_input("CMake flags (see https://github.com/late-parrot/craven for details).")
+    run(["cmake", "..", f"-DCMAKE_INSTALL_PREFIX={main_dir}", "-DCMAKE_BUILD_TYPE=Release"] + opt_flags + shlex.split(cmake_flags))
     print()
 
 
-    build_flags = skippable_input("Build flags (see https://github.com/late-parrot/craven for details).")
-    run(["cmake", "--build", "."] + build_flags.split())
+    build_flags = args.build_flags if args.build_flags is not None else skippable_input("Build flags (see https://github.com/late-parrot/craven for details).")
+    build_flags = shlex.split(build_flags)
+    if not any(f.startswith(("-j", "--parallel")) for f in build_flags):
+        build_flags = ["--parallel", str(os.cpu_count() or 1)] + build_flags
+    run(["cmake", "--build", "."] + build_flags)
     print()
 
 
-    run(["cmake", "--install", "."])
+    run(["cmake", "--install", "."], quiet=True)
     print()
     os.chdir(cwd)
 
 
-    if bin_dir not in os.environ.get("PATH", "").split(os.pathsep):
-        match ask_option(f"The raven binary is installed in {bin_dir}, which is not on PATH. Would you like to add this directory to PATH?",
-                    "Yes, add this directory to PATH using ~/.bashrc or a similar file",
-                    "No, I don't want the raven binary on PATH"):
+    path_entries = {os.path.normpath(p) for p in os.environ.get("PATH", "").split(os.pathsep) if p}
+    if os.path.normpath(bin_dir) not in path_entries:
+        if args.bashrc is not None:
+            choice = 1
+        elif assume_yes:
+            choice = 2 # There is no file to write to without --bashrc
+        else:
+            choice = ask_option(f"The raven binary is installed in {bin_dir}, which is not on PATH. Would you like to add this directory to PATH?",
+                        "Yes, add this directory to PATH using ~/.bashrc or a similar file",
+                        "No, I don't want the raven binary on PATH")
+        match choice:
             case 1:
-                bashrc = Path(input_tty("Path to .bashrc or similar file: ")).expanduser().resolve()
+                bashrc = (args.bashrc or Path(input_tty("Path to .bashrc or similar file: "))).expanduser().resolve()
                 if not bashrc.exists() or not bashrc.is_file():
                     abort("\nFile not found. Aborting...")
                 is_empty = bashrc.read_text() == ""
@@ -117,11 +181,15 @@ def main():
     
 
     os.chdir(build_dir)
-    match ask_option(f"Would you like to run the test suite to verify your installation? This may take several minutes.",
-                    "Yes, run the tests",
-                    "No, dont run the tests"):
+    if args.run_tests is not None:
+        choice = 1 if args.run_tests else 2
+    else:
+        choice = ask_option(f"Would you like to run the test suite to verify your installation? This may take several minutes.",
+                        "Yes, run the tests",
+                        "No, dont run the tests")
+    match choice:
         case 1:
-            run(["ctest"])
+            run(["ctest", "-j", str(os.cpu_count() or 1), "--output-on-failure"])
             print()
         case 2: pass
 
@@ -0,0 +1,35 @@
+# Variant of zoo.py with a slotted Zoo, showing how much of the Python time
+# goes to instance-dict lookups. zoo.rvn has no equivalent, so compare the
+# Raven numbers against zoo.py, not this file.
+
+import time
+
+class Zoo:
+    __slots__ = ("aardvark", "baboon", "cat", "donkey", "elephant", "fox")
+    def __init__(self):
+        self.aardvark = 1
+        self.baboon   = 1
+        self.cat      = 1
+        self.donkey   = 1
+        self.elephant = 1
+        self.fox      = 1
+    def ant(self): return self.aardvark
+    def banana(self): return self.baboon
+    def tuna(self): return self.cat
+    def hay(self): return self.donkey
+    def grass(self): return self.elephant
+    def mouse(self): return self.fox
+
+zoo = Zoo()
+total = 0
+start = time.time()
+while (total < 100000000):
+    total = (total + zoo.ant()
+                   + zoo.banana()
+                   + zoo.tuna()
+                   + zoo.hay()
+                   + zoo.grass()
+                   + zoo.mouse())
+
+print(time.time() - start)
+print(total)
\ No newline at end of file